@@ -9,7 +9,9 @@ import sys
 import time
 import os
 import json
+import math
 import threading
+import concurrent.futures
 import tkinter as tk
 from tkinter import ttk, messagebox
 from ctypes import windll, byref, Structure, c_ulong, c_void_p, c_byte, c_int
@@ -21,6 +23,7 @@ try:
     import pystray
     from PIL import Image, ImageDraw
     from win32com.shell import shell, shellcon
+    from win32com.client import Dispatch
     WMI_AVAILABLE = True
 except ImportError as e:
     print(f"Import error: {e}")
@@ -29,9 +32,12 @@ except ImportError as e:
 
 # Define Windows API structures and constants for display control
 class PHYSICAL_MONITOR(Structure):
+    # Matches the Win32 definition: szPhysicalMonitorDescription is
+    # WCHAR[128], not a DWORD array. c_wchar also means .description reads
+    # back as a Python string with no manual decoding.
     _fields_ = [
         ('handle', c_void_p),
-        ('description', c_ulong * 128)
+        ('description', ctypes.c_wchar * 128)
     ]
 
 # Constants for display detection and control
@@ -39,6 +45,65 @@ MONITOR_DEFAULTTOPRIMARY = 0x00000001
 WM_MONITORMAGIC = 0x2111
 MC_GETMONITORNAME = 0x0001
 
+# Bind the Win32 entry points once with explicit prototypes. Going through
+# windll.<dll>.<name> re-resolves the attribute with default marshalling on
+# every call; explicit argtypes also keep 64-bit handles from truncating.
+user32 = ctypes.WinDLL('user32', use_last_error=True)
+dxva2 = ctypes.WinDLL('dxva2', use_last_error=True)
+
+GetDesktopWindow = user32.GetDesktopWindow
+GetDesktopWindow.argtypes = []
+GetDesktopWindow.restype = c_void_p
+
+MonitorFromWindow = user32.MonitorFromWindow
+MonitorFromWindow.argtypes = [c_void_p, c_ulong]
+MonitorFromWindow.restype = c_void_p
+
+GetNumberOfPhysicalMonitorsFromHMONITOR = dxva2.GetNumberOfPhysicalMonitorsFromHMONITOR
+GetNumberOfPhysicalMonitorsFromHMONITOR.argtypes = [c_void_p, ctypes.POINTER(c_ulong)]
+GetNumberOfPhysicalMonitorsFromHMONITOR.restype = c_int
+
+GetPhysicalMonitorsFromHMONITOR = dxva2.GetPhysicalMonitorsFromHMONITOR
+GetPhysicalMonitorsFromHMONITOR.argtypes = [c_void_p, c_ulong, ctypes.POINTER(PHYSICAL_MONITOR)]
+GetPhysicalMonitorsFromHMONITOR.restype = c_int
+
+DestroyPhysicalMonitors = dxva2.DestroyPhysicalMonitors
+DestroyPhysicalMonitors.argtypes = [c_ulong, ctypes.POINTER(PHYSICAL_MONITOR)]
+DestroyPhysicalMonitors.restype = c_int
+
+SetVCPFeature = dxva2.SetVCPFeature
+SetVCPFeature.argtypes = [c_void_p, c_ulong, c_ulong]
+SetVCPFeature.restype = c_int
+
+SetMonitorBrightness = dxva2.SetMonitorBrightness
+SetMonitorBrightness.argtypes = [c_void_p, c_ulong]
+SetMonitorBrightness.restype = c_int
+
+GetVCPFeatureAndVCPFeatureReply = dxva2.GetVCPFeatureAndVCPFeatureReply
+GetVCPFeatureAndVCPFeatureReply.argtypes = [c_void_p, c_ulong, ctypes.POINTER(c_ulong),
+                                            ctypes.POINTER(c_ulong), ctypes.POINTER(c_ulong)]
+GetVCPFeatureAndVCPFeatureReply.restype = c_int
+
+# VCP codes for brightness control. Most panels answer 0x10 (Brightness),
+# but some Apple displays only respond to 0x6B (Backlight White Level),
+# which is also the code that unlocks the >100% boost range.
+VCP_BRIGHTNESS = 0x10
+VCP_BACKLIGHT = 0x6B
+
+# Tray icon geometry, computed once at import. The sun never changes, so
+# there is no reason to redo the trig every time the icon is (re)built.
+_ICON_SIZE = 64
+_SUN_CENTER = _ICON_SIZE // 2
+_SUN_RADIUS = 15
+_SUN_RAY_LENGTH = 10
+_SUN_RAYS = tuple(
+    (_SUN_CENTER + (_SUN_RADIUS + 2) * math.cos(math.radians(angle)),
+     _SUN_CENTER + (_SUN_RADIUS + 2) * math.sin(math.radians(angle)),
+     _SUN_CENTER + (_SUN_RADIUS + _SUN_RAY_LENGTH) * math.cos(math.radians(angle)),
+     _SUN_CENTER + (_SUN_RADIUS + _SUN_RAY_LENGTH) * math.sin(math.radians(angle)))
+    for angle in range(0, 360, 45)
+)
+
 # Check if running as admin
 def is_admin():
     try:
@@ -46,6 +111,10 @@ def is_admin():
     except:
         return False
 
+# Admin status cannot change for the life of the process; resolve the
+# syscall once at import instead of on every check
+IS_ADMIN = is_admin()
+
 # Re-launch as admin if needed
 def run_as_admin():
     script = sys.argv[0]
@@ -57,134 +126,126 @@ def run_as_admin():
     print("Requesting administrative privileges...")
     ctypes.windll.shell32.ShellExecuteW(None, "runas", args[0], " ".join(args[1:]), None, 1)
 
-# Method 1: Set brightness using WMI
-def set_brightness_wmi(brightness=250):
-    """Set display brightness using WMI"""
-    try:
-        if not WMI_AVAILABLE:
+class MonitorCache:
+    """Caches physical monitor handles so brightness writes skip Win32 enumeration"""
+    def __init__(self, saved_codes=None):
+        self._phys_monitors = None
+        self._count = 0
+        self._vcp_codes = []
+        self._pool = None
+        # Known-good VCP codes from a previous launch, keyed by monitor index
+        self._saved_codes = saved_codes or {}
+        self.refresh()
+
+    def refresh(self):
+        """Re-enumerate physical monitors and cache their handles"""
+        self.invalidate()
+        try:
+            # Get primary monitor
+            hMonitor = MonitorFromWindow(
+                GetDesktopWindow(),
+                MONITOR_DEFAULTTOPRIMARY
+            )
+
+            if not hMonitor:
+                return False
+
+            # Get physical monitor counts
+            physical_monitor_count = c_ulong()
+            if not GetNumberOfPhysicalMonitorsFromHMONITOR(
+                hMonitor, byref(physical_monitor_count)):
+                return False
+
+            # Get physical monitor handles
+            physical_monitors = (PHYSICAL_MONITOR * physical_monitor_count.value)()
+            if not GetPhysicalMonitorsFromHMONITOR(
+                hMonitor, physical_monitor_count.value, physical_monitors):
+                return False
+
+            self._phys_monitors = physical_monitors
+            self._count = physical_monitor_count.value
+
+            # Resolve the working VCP code per monitor, probing only when a
+            # previous launch hasn't already recorded one
+            self._vcp_codes = []
+            for i in range(self._count):
+                code = self._saved_codes.get(str(i))
+                if code not in (VCP_BRIGHTNESS, VCP_BACKLIGHT):
+                    code = self._probe_vcp_code(physical_monitors[i].handle)
+                self._vcp_codes.append(code)
+
+            # Each monitor hangs off its own I2C bus, so writes to several
+            # of them can overlap; one worker per monitor, capped at 4
+            if self._count > 1:
+                self._pool = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=min(4, self._count))
+
+            return True
+
+        except Exception as e:
+            print(f"Error enumerating monitors: {e}")
             return False
-            
-        # Initialize COM
-        pythoncom.CoInitialize()
-        
-        # Connect to WMI
-        wmi_instance = wmi.WMI(namespace='wmi')
-        
-        # Find monitors that support brightness control
-        monitors = wmi_instance.WmiMonitorBrightnessMethods()
-        
-        # Check for Apple displays
-        apple_found = False
-        for monitor in monitors:
+
+    def _probe_vcp_code(self, handle):
+        """Find which VCP code this panel answers for brightness"""
+        for code in (VCP_BRIGHTNESS, VCP_BACKLIGHT):
+            vct = c_ulong()
+            current = c_ulong()
+            maximum = c_ulong()
             try:
-                # Get monitor information
-                monitor_info = wmi_instance.WmiMonitorID()[0]
-                manufacturer = ''.join([chr(i) for i in monitor_info.ManufacturerName if i > 0])
-                
-                # Set brightness for all displays, but note if we found Apple
-                if 'APPLE' in manufacturer.upper():
-                    print(f"Found Apple display: {manufacturer}")
-                    apple_found = True
-                    
-                monitor.WmiSetBrightness(0, brightness)
-                print(f"Set brightness to {brightness}% using WMI")
-                
-            except Exception as e:
-                print(f"Error getting monitor info: {e}")
-        
-        # Uninitialize COM
-        pythoncom.CoUninitialize()
-        
-        return apple_found
-        
-    except Exception as e:
-        print(f"WMI error: {e}")
-        return False
+                if GetVCPFeatureAndVCPFeatureReply(
+                        handle, code, byref(vct), byref(current), byref(maximum)) \
+                        and maximum.value > 0:
+                    return code
+            except Exception:
+                pass
+        return VCP_BRIGHTNESS
 
-# Method 2: Set brightness using DDC/CI
-def set_brightness_ddc(brightness=250):
-    """Set display brightness using DDC/CI commands"""
-    try:
-        # Get primary monitor
-        hMonitor = windll.user32.MonitorFromWindow(
-            windll.user32.GetDesktopWindow(),
-            MONITOR_DEFAULTTOPRIMARY
-        )
-        
-        if not hMonitor:
-            return False
-            
-        # Get physical monitor counts
-        physical_monitor_count = c_ulong()
-        if not windll.dxva2.GetNumberOfPhysicalMonitorsFromHMONITOR(
-            hMonitor, byref(physical_monitor_count)):
-            return False
-            
-        # Get physical monitor handles
-        physical_monitors = (PHYSICAL_MONITOR * physical_monitor_count.value)()
-        if not windll.dxva2.GetPhysicalMonitorsFromHMONITOR(
-            hMonitor, physical_monitor_count.value, physical_monitors):
-            return False
-            
-        success = False
-        
-        # Try to set brightness for each monitor
-        for i, monitor in enumerate(physical_monitors):
-            # Brightness VCP code is 0x10
-            if windll.dxva2.SetVCPFeature(monitor.handle, 0x10, brightness):
-                print(f"Set brightness to {brightness}% using DDC/CI on monitor {i+1}")
-                success = True
-                
-        # Cleanup
-        windll.dxva2.DestroyPhysicalMonitors(physical_monitor_count.value, physical_monitors)
-        
-        return success
-        
-    except Exception as e:
-        print(f"DDC/CI error: {e}")
-        return False
+    def map_writes(self, write_fn):
+        """Run write_fn(handle, vcp_code) across all monitors, concurrently
+        when more than one is attached"""
+        handles = self.handles
+        codes = self._vcp_codes
 
-# Method 3: Set brightness using direct API
-def set_brightness_api(brightness=250):
-    """Set brightness using direct Windows API calls"""
-    try:
-        # Get primary monitor
-        hMonitor = windll.user32.MonitorFromWindow(
-            windll.user32.GetDesktopWindow(),
-            MONITOR_DEFAULTTOPRIMARY
-        )
-        
-        if not hMonitor:
-            return False
-            
-        # Get physical monitor counts
-        physical_monitor_count = c_ulong()
-        if not windll.dxva2.GetNumberOfPhysicalMonitorsFromHMONITOR(
-            hMonitor, byref(physical_monitor_count)):
-            return False
-            
-        # Get physical monitor handles
-        physical_monitors = (PHYSICAL_MONITOR * physical_monitor_count.value)()
-        if not windll.dxva2.GetPhysicalMonitorsFromHMONITOR(
-            hMonitor, physical_monitor_count.value, physical_monitors):
-            return False
-            
-        success = False
-        
-        # Try to set brightness for each monitor
-        for i, monitor in enumerate(physical_monitors):
-            if windll.dxva2.SetMonitorBrightness(monitor.handle, brightness):
-                print(f"Set brightness to {brightness}% using direct API on monitor {i+1}")
-                success = True
-                
-        # Cleanup
-        windll.dxva2.DestroyPhysicalMonitors(physical_monitor_count.value, physical_monitors)
-        
-        return success
-        
-    except Exception as e:
-        print(f"API error: {e}")
-        return False
+        if not handles:
+            return []
+
+        # Single monitor (the common case): no pool overhead
+        if len(handles) == 1 or self._pool is None:
+            return [write_fn(handle, code) for handle, code in zip(handles, codes)]
+
+        futures = [self._pool.submit(write_fn, handle, code)
+                   for handle, code in zip(handles, codes)]
+        concurrent.futures.wait(futures, timeout=2.0)
+        return [f.result() if f.done() and not f.exception() else False
+                for f in futures]
+
+    def invalidate(self):
+        """Release cached handles so the next refresh re-enumerates"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False)
+            self._pool = None
+        if self._phys_monitors is not None:
+            try:
+                DestroyPhysicalMonitors(self._count, self._phys_monitors)
+            except Exception:
+                pass
+        self._phys_monitors = None
+        self._count = 0
+
+    @property
+    def handles(self):
+        """Return the cached physical monitor handles, re-enumerating if needed"""
+        if self._phys_monitors is None:
+            self.refresh()
+        if self._phys_monitors is None:
+            return []
+        return [monitor.handle for monitor in self._phys_monitors]
+
+    @property
+    def vcp_codes(self):
+        """Return the brightness VCP code for each cached handle"""
+        return self._vcp_codes
 
 class BrightnessController:
     def __init__(self):
@@ -192,7 +253,44 @@ class BrightnessController:
                                         "apple_brightness_settings.json")
         self.current_brightness = 250  # Default to max brightness
         self.autostart_enabled = False  # Initialize this flag
+        self._saved_vcp_codes = {}  # Per-monitor VCP codes from earlier launches
+        self._preferred_method = None  # Name of the last write method that worked
+        self._last_saved = None  # Last settings dict written to disk
         self.load_settings()
+
+        # Enumerate physical monitors once and reuse the handles for all writes
+        self.monitor_cache = MonitorCache(self._saved_vcp_codes)
+
+        # Persist probed VCP codes so future launches skip the probe
+        probed = {str(i): code for i, code in enumerate(self.monitor_cache.vcp_codes)}
+        if probed and probed != self._saved_vcp_codes:
+            self._saved_vcp_codes = probed
+            self.save_settings()
+
+        # WMI connection is expensive to build; initialize lazily on first use
+        self._wmi = None
+        self._wmi_methods = None
+        self._wmi_ids = None
+
+        # COM shell objects are slow to activate; cache them across clicks
+        self._wsh = None
+        self._startup_path = None
+        self._autostart_cached = None
+
+        # Debounce state for slider-driven brightness changes
+        self._pending_after = None
+        self._pending_value = None
+
+        # Last value successfully written to the hardware; repeat writes of
+        # the same value are skipped (a DDC write can flicker the OSD)
+        self._last_written = None
+
+        # Brightness writes run on a worker thread; a DDC write can block
+        # ~50ms per monitor and would otherwise freeze the Tk main thread.
+        # A single target slot means newer values supersede in-flight ones.
+        self._target_value = self.current_brightness
+        self._wake = threading.Event()
+        threading.Thread(target=self._brightness_worker, daemon=True).start()
         
         # Initialize the system tray
         self.icon = None
@@ -210,17 +308,27 @@ class BrightnessController:
         self.exiting = False
         
     def setup_gui(self):
-        """Create the brightness control window"""
+        """Create the hidden Tk root; the widgets are built on first show"""
         self.root = tk.Tk()
         self.root.title("Apple Display Brightness")
-        self.root.geometry("400x140")
         self.root.resizable(False, False)
         self.root.protocol("WM_DELETE_WINDOW", self.hide_window)
-        
+
+        # Widget construction dominates window cost and the app usually just
+        # sits in the tray, so defer it until the user opens the panel
+        self._built = False
+
+        # Initially hide the window
+        self.hide_window()
+
+    def _build_controls(self):
+        """Build the brightness control window widgets"""
+        self.root.geometry("400x140")
+
         # Apply modern style
         style = ttk.Style()
         style.theme_use('clam')  # Use a modern theme
-        
+
         # Main frame
         main_frame = ttk.Frame(self.root, padding="20")
         main_frame.pack(fill=tk.BOTH, expand=True)
@@ -242,14 +350,16 @@ class BrightnessController:
         self.brightness_value_label = ttk.Label(slider_frame, text=f"{self.current_brightness}%", width=5)
         self.brightness_value_label.pack(side=tk.RIGHT)
         
-        # Brightness slider
+        # Brightness slider bound to an IntVar: Tk does the float->int
+        # coercion in C instead of the callback parsing a string each event
+        self.brightness_var = tk.IntVar(value=self.current_brightness)
+        self.brightness_var.trace_add('write', self._on_brightness_changed)
         self.brightness_slider = ttk.Scale(
-            main_frame, 
-            from_=0, 
-            to=250, 
+            main_frame,
+            from_=0,
+            to=250,
             orient=tk.HORIZONTAL,
-            value=self.current_brightness,
-            command=self.update_brightness_value
+            variable=self.brightness_var
         )
         self.brightness_slider.pack(fill=tk.X)
         
@@ -259,43 +369,208 @@ class BrightnessController:
         
         # Apply button
         apply_button = ttk.Button(button_frame, text="Apply", 
-                                 command=lambda: self.set_brightness(int(self.brightness_slider.get())))
+                                 command=lambda: self.set_brightness(self.brightness_var.get()))
         apply_button.pack(side=tk.RIGHT)
         
         # Save button
-        save_button = ttk.Button(button_frame, text="Save as Default", 
+        save_button = ttk.Button(button_frame, text="Save as Default",
                                command=self.save_settings)
         save_button.pack(side=tk.LEFT)
-        
-        # Initially hide the window
-        self.hide_window()
-        
-    def update_brightness_value(self, value):
-        """Update the brightness value label as slider moves"""
-        brightness = int(float(value))
-        self.brightness_value_label.config(text=f"{brightness}%")
-        
+
+    def _on_brightness_changed(self, *_):
+        """Update the label and queue a write when the slider value changes"""
+        brightness = self.brightness_var.get()
+        self.brightness_value_label.configure(text=f"{brightness}%")
+
+        # Coalesce rapid slider events into a single trailing brightness write
+        self._pending_value = brightness
+        if self._pending_after:
+            self.root.after_cancel(self._pending_after)
+        self._pending_after = self.root.after(40, self._flush_brightness)
+
+    def _flush_brightness(self):
+        """Apply the most recent pending slider value"""
+        self._pending_after = None
+        if self._pending_value is not None:
+            self.set_brightness(self._pending_value)
+
     def set_brightness(self, brightness):
-        """Try all methods to set brightness"""
+        """Queue a brightness write; the worker always applies the latest value"""
         self.current_brightness = brightness
-        
-        # Define methods to try
+        self._target_value = brightness
+        self._wake.set()
+        return True
+
+    def _brightness_worker(self):
+        """Worker thread that applies the most recent requested brightness"""
+        # COM must be initialized per-thread for the WMI fallback
+        try:
+            pythoncom.CoInitialize()
+        except Exception:
+            pass
+
+        while True:
+            self._wake.wait()
+            self._wake.clear()
+            # Only the latest value matters; intermediates are dropped
+            self._apply_brightness(self._target_value)
+
+    def _apply_brightness(self, brightness):
+        """Try all methods to set brightness, preferring the known-good one"""
+        # The hardware is already at this value; skip the round-trip
+        if brightness == self._last_written:
+            return True
+
+        # DDC/CI first: it is the path that actually reaches external Apple
+        # displays and avoids the COM setup cost of WMI entirely.
         methods = [
-            set_brightness_wmi,
-            set_brightness_ddc,
-            set_brightness_api
+            self.set_brightness_ddc,
+            self.set_brightness_api
         ]
-        
+
+        # WMI brightness is laptop-panel oriented and only accepts 0-100,
+        # so it is a last resort for in-range values only.
+        if 0 <= brightness <= 100:
+            methods.append(self.set_brightness_wmi)
+
+        # Once a method has worked on this machine the others never help;
+        # try it first and only rediscover if it stops working
+        if self._preferred_method:
+            preferred = getattr(self, self._preferred_method, None)
+            if preferred in methods:
+                methods.remove(preferred)
+                methods.insert(0, preferred)
+
         # Try each method in sequence
         for method in methods:
             try:
                 if method(brightness):
+                    self._last_written = brightness
+                    if method.__name__ != self._preferred_method:
+                        self._preferred_method = method.__name__
+                        self.save_settings()
                     return True
             except Exception as e:
                 print(f"Method failed: {e}")
-                
+
+            # The remembered method failed; forget it and fall through
+            if method.__name__ == self._preferred_method:
+                self._preferred_method = None
+
         return False
+
+    def _wmi_connect(self):
+        """Initialize the WMI connection and monitor enumerations once"""
+        if self._wmi is None:
+            # Initialize COM
+            pythoncom.CoInitialize()
+
+            # Connect to WMI and cache the monitor enumerations
+            self._wmi = wmi.WMI(namespace='wmi')
+            self._wmi_methods = list(self._wmi.WmiMonitorBrightnessMethods())
+            self._wmi_ids = list(self._wmi.WmiMonitorID())
+        return self._wmi
+
+    def set_brightness_wmi(self, brightness=250):
+        """Set display brightness using WMI"""
+        try:
+            if not WMI_AVAILABLE:
+                return False
+
+            self._wmi_connect()
+
+            # Pair each monitor's brightness methods with its own ID record;
+            # both enumerations were cached once by _wmi_connect
+            apple_found = False
+            for monitor_info, monitor in zip(self._wmi_ids, self._wmi_methods):
+                try:
+                    # ManufacturerName is a sequence of character codes; one
+                    # C-level bytes() build beats a per-char join loop
+                    manufacturer = bytes(monitor_info.ManufacturerName) \
+                        .rstrip(b'\x00').decode('ascii', 'ignore')
+
+                    # Set brightness for all displays, but note if we found Apple
+                    if 'APPLE' in manufacturer.upper():
+                        print(f"Found Apple display: {manufacturer}")
+                        apple_found = True
+
+                    monitor.WmiSetBrightness(0, brightness)
+                    print(f"Set brightness to {brightness}% using WMI")
+
+                except Exception as e:
+                    print(f"Error getting monitor info: {e}")
+
+            return apple_found
+
+        except Exception as e:
+            print(f"WMI error: {e}")
+            # Drop the cached connection so the next attempt rebuilds it
+            self._wmi = None
+            self._wmi_methods = None
+            self._wmi_ids = None
+            return False
+
+    def _report_writes(self, results, brightness, method_name):
+        """Log per-monitor write results and report overall success"""
+        success = False
+        for i, ok in enumerate(results):
+            if ok:
+                print(f"Set brightness to {brightness}% using {method_name} on monitor {i+1}")
+                success = True
+        return success
+
+    def set_brightness_ddc(self, brightness=250):
+        """Set display brightness using DDC/CI commands on the cached handles"""
+        try:
+            # Write all monitors (in parallel when several are attached),
+            # using the VCP code each panel is known to answer
+            results = self.monitor_cache.map_writes(
+                lambda handle, code: SetVCPFeature(handle, code, brightness))
+            if self._report_writes(results, brightness, "DDC/CI"):
+                return True
+
+            # Handles go stale after a display change; re-enumerate and retry
+            # once (and forget the last written value: new display, new state)
+            if self.monitor_cache.refresh():
+                self._last_written = None
+                results = self.monitor_cache.map_writes(
+                    lambda handle, code: SetVCPFeature(handle, code, brightness))
+                return self._report_writes(results, brightness, "DDC/CI")
+
+            return False
+
+        except Exception as e:
+            print(f"DDC/CI error: {e}")
+            return False
+
+    def set_brightness_api(self, brightness=250):
+        """Set brightness using direct Windows API calls on the cached handles"""
+        try:
+            results = self.monitor_cache.map_writes(
+                lambda handle, code: SetMonitorBrightness(handle, brightness))
+            if self._report_writes(results, brightness, "direct API"):
+                return True
+
+            # Handles go stale after a display change; re-enumerate and retry
+            # once (and forget the last written value: new display, new state)
+            if self.monitor_cache.refresh():
+                self._last_written = None
+                results = self.monitor_cache.map_writes(
+                    lambda handle, code: SetMonitorBrightness(handle, brightness))
+                return self._report_writes(results, brightness, "direct API")
+
+            return False
+
+        except Exception as e:
+            print(f"API error: {e}")
+            return False
         
+    def _make_setter(self, value):
+        """Build a tray callback with a fixed brightness value prebound"""
+        def apply_preset(icon=None, item=None):
+            self.set_brightness(value)
+        return apply_preset
+
     def setup_tray(self):
         """Create the system tray icon and menu"""
         try:
@@ -306,19 +581,24 @@ class BrightnessController:
             self.autostart_enabled = self.check_autostart_enabled()
             
             # Define menu items correctly - use lambda for checked property
-            menu_items = [
-                pystray.MenuItem('Brightness Control', self.show_window),
-                pystray.MenuItem('Apply 100%', lambda: self.set_brightness(100)),
-                pystray.MenuItem('Apply 175%', lambda: self.set_brightness(175)),
-                pystray.MenuItem('Apply 250%', lambda: self.set_brightness(250)),
-                pystray.MenuItem('Start with Windows', 
-                                self.toggle_autostart, 
+            menu_items = [pystray.MenuItem('Brightness Control', self.show_window)]
+
+            # Preset entries come from one factory so each click goes straight
+            # to the worker-queue setter with its value prebound
+            for value in (100, 175, 250):
+                menu_items.append(pystray.MenuItem(f'Apply {value}%', self._make_setter(value)))
+
+            menu_items.extend([
+                pystray.MenuItem('Start with Windows',
+                                self.toggle_autostart,
                                 lambda item: self.autostart_enabled),
                 pystray.MenuItem('Exit', self.exit_app)
-            ]
+            ])
             
-            # Create the icon with menu
-            self.icon = pystray.Icon("AppleBrightness", icon_image, "Apple Display Brightness", menu_items)
+            # Create the icon with a lazy menu: pystray re-evaluates the
+            # checked= callables each time the menu is opened
+            self.icon = pystray.Icon("AppleBrightness", icon_image, "Apple Display Brightness",
+                                     menu=pystray.Menu(*menu_items))
             
             # Start the icon in a separate thread
             threading.Thread(target=self.icon.run, daemon=True).start()
@@ -329,39 +609,41 @@ class BrightnessController:
         
     def create_tray_icon(self):
         """Create a simple icon for the system tray"""
+        # The icon is static, so build it once and hand back the cached image
+        if getattr(self, '_tray_icon_image', None) is not None:
+            return self._tray_icon_image
+
         # Create a simple square icon with a sun symbol
-        width, height = 64, 64
-        image = Image.new('RGB', (width, height), color=(255, 255, 255))
+        image = Image.new('RGB', (_ICON_SIZE, _ICON_SIZE), color=(255, 255, 255))
         draw = ImageDraw.Draw(image)
-        
-        # Draw a sun
-        center = width // 2
-        radius = 15
-        ray_length = 10
-        
+
         # Draw circle
-        draw.ellipse((center - radius, center - radius, 
-                      center + radius, center + radius), 
+        draw.ellipse((_SUN_CENTER - _SUN_RADIUS, _SUN_CENTER - _SUN_RADIUS,
+                      _SUN_CENTER + _SUN_RADIUS, _SUN_CENTER + _SUN_RADIUS),
                      fill=(255, 204, 0))
-        
-        # Draw rays
-        for i in range(8):
-            angle = i * 45  # degrees
-            import math
-            rad = math.radians(angle)
-            x1 = center + (radius + 2) * math.cos(rad)
-            y1 = center + (radius + 2) * math.sin(rad)
-            x2 = center + (radius + ray_length) * math.cos(rad)
-            y2 = center + (radius + ray_length) * math.sin(rad)
-            draw.line((x1, y1, x2, y2), fill=(255, 204, 0), width=3)
-        
+
+        # Draw rays from the precomputed endpoints
+        for ray in _SUN_RAYS:
+            draw.line(ray, fill=(255, 204, 0), width=3)
+
+        self._tray_icon_image = image
         return image
         
-    def show_window(self):
-        """Show the brightness control window"""
+    def show_window(self, icon=None, item=None):
+        """Show the brightness control window (safe to call from the tray thread)"""
+        # The tray menu invokes this on pystray's thread; widget
+        # construction and deiconify must run on the Tk thread
+        self.root.after(0, self._show_window_main)
+
+    def _show_window_main(self):
+        """Build (on first open) and present the window on the Tk thread"""
+        # Build the widgets on first open
+        if not self._built:
+            self._build_controls()
+            self._built = True
+
         # Update the slider with current brightness
-        self.brightness_slider.set(self.current_brightness)
-        self.update_brightness_value(self.current_brightness)
+        self.brightness_var.set(self.current_brightness)
         
         # Show and focus the window
         self.root.deiconify()
@@ -414,12 +696,25 @@ class BrightnessController:
         try:
             settings = {
                 'brightness': self.current_brightness,
-                'autostart': self.autostart_enabled
+                'autostart': self.autostart_enabled,
+                'vcp_codes': self._saved_vcp_codes,
+                'preferred_method': self._preferred_method
             }
-            
-            with open(self.settings_file, 'w') as f:
-                json.dump(settings, f)
-                
+
+            # Nothing changed since the last write: skip the disk I/O
+            if settings == self._last_saved:
+                return
+
+            # Write to a temp file and rename so a crash mid-write can never
+            # leave a truncated settings file behind
+            tmp_file = self.settings_file + '.tmp'
+            with open(tmp_file, 'w') as f:
+                json.dump(settings, f, separators=(',', ':'))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_file, self.settings_file)
+
+            self._last_saved = settings
             print(f"Settings saved: {settings}")
         except Exception as e:
             print(f"Error saving settings: {e}")
@@ -433,24 +728,33 @@ class BrightnessController:
                     
                 self.current_brightness = settings.get('brightness', 250)
                 self.autostart_enabled = settings.get('autostart', False)
+                self._saved_vcp_codes = settings.get('vcp_codes', {})
+                self._preferred_method = settings.get('preferred_method')
+                self._last_saved = settings
                 print(f"Loaded settings: brightness={self.current_brightness}%, autostart={self.autostart_enabled}")
         except Exception as e:
             print(f"Error loading settings: {e}")
             
     def get_startup_path(self):
         """Get the path to the startup shortcut"""
+        # SHGetFolderPath is an RPC into shell32; resolve it once and reuse
+        if self._startup_path is not None:
+            return self._startup_path
+
         try:
             startup_folder = shell.SHGetFolderPath(0, shellcon.CSIDL_STARTUP, 0, 0)
-            shortcut_path = os.path.join(startup_folder, "AppleBrightnessControl.lnk")
-            return shortcut_path
+            self._startup_path = os.path.join(startup_folder, "AppleBrightnessControl.lnk")
         except Exception as e:
             print(f"Error getting startup path: {e}")
-            return os.path.join(os.environ.get('APPDATA', ''), 
+            self._startup_path = os.path.join(os.environ.get('APPDATA', ''),
                              r"Microsoft\Windows\Start Menu\Programs\Startup\AppleBrightnessControl.lnk")
+        return self._startup_path
         
     def check_autostart_enabled(self):
-        """Check if autostart is enabled - separate from menu callback"""
-        return os.path.exists(self.get_startup_path())
+        """Check if autostart is enabled - cached, invalidated on toggle"""
+        if self._autostart_cached is None:
+            self._autostart_cached = os.path.exists(self.get_startup_path())
+        return self._autostart_cached
         
     def toggle_autostart(self, icon, item):
         """Toggle autostart with Windows - menu callback compatible"""
@@ -464,16 +768,17 @@ class BrightnessController:
                     if os.path.exists(shortcut_path):
                         os.remove(shortcut_path)
                     self.autostart_enabled = False
+                    self._autostart_cached = False
                     print("Removed from startup")
                 except Exception as e:
                     print(f"Error removing from startup: {e}")
             else:
                 # Add to startup by creating a shortcut
                 try:
-                    from win32com.client import Dispatch
-                    
-                    shell_obj = Dispatch('WScript.Shell')
-                    shortcut = shell_obj.CreateShortCut(shortcut_path)
+                    # Activate WScript.Shell once and keep it for later toggles
+                    if self._wsh is None:
+                        self._wsh = Dispatch('WScript.Shell')
+                    shortcut = self._wsh.CreateShortCut(shortcut_path)
                     
                     # Get the path of the current script/executable
                     if getattr(sys, 'frozen', False):
@@ -490,22 +795,20 @@ class BrightnessController:
                     shortcut.Save()
                     
                     self.autostart_enabled = True
+                    self._autostart_cached = True
                     print(f"Added to startup: {shortcut_path}")
                 except Exception as e:
                     print(f"Error adding to startup: {e}")
                     
-            # Save settings after toggling
+            # Save settings after toggling. No update_menu() needed: the
+            # checked= callable is re-queried the next time the menu opens.
             self.save_settings()
-            
-            # Force update the system tray menu
-            if self.icon:
-                self.icon.update_menu()
         except Exception as e:
             print(f"Error toggling autostart: {e}")
 
 def main():
     # Check for admin privileges - always require admin now
-    if not is_admin():
+    if not IS_ADMIN:
         print("This application requires administrator privileges for display brightness control.")
         print("Requesting elevation...")
         
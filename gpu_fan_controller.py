@@ -1,24 +1,39 @@
 import sys
 import platform
 from ctypes import *
+import array
+import bisect
+import collections
 import time
 import threading
 import json
+import logging
 import os
+import pickle
+import queue
 try:
-    import pystray
-    from PIL import Image, ImageDraw, ImageFont
-    import tkinter as tk
-    from tkinter import simpledialog, messagebox, ttk
+    import orjson
 except ImportError:
-    print("Required packages not found. Installing pystray and pillow...")
-    import subprocess
-    import sys
-    subprocess.check_call([sys.executable, "-m", "pip", "install", "pystray", "pillow"])
-    import pystray
-    from PIL import Image, ImageDraw, ImageFont
-    import tkinter as tk
-    from tkinter import simpledialog, messagebox, ttk
+    orjson = None  # Config persistence falls back to stdlib json
+try:
+    import numpy as np
+except ImportError:
+    np = None  # Batch curve evaluation falls back to the scalar path
+import tkinter as tk
+from tkinter import simpledialog, messagebox, ttk
+
+# The tray stack (pystray plus pillow, megabytes of DLLs) is only needed
+# in tray mode; CLI invocations like "gpu_fan_controller.py 50" never pay
+# for it. _load_gui() imports it on first use. tkinter has to stay at
+# module level because the dialog classes subclass tk.Toplevel at class
+# definition time.
+pystray = None
+Image = ImageDraw = ImageFont = None
+
+# Driver-failure chatter from the polling path goes through the logger:
+# a print per failed tick takes the stdout lock and encodes every pass,
+# and a wedged driver fails on every single poll
+log = logging.getLogger(__name__)
 
 class ADLFanSpeedValue(Structure):
     _fields_ = [
@@ -46,112 +61,131 @@ def get_adl_dll():
         print("Failed to load ADL library. Make sure AMD drivers are installed.")
         return None
 
+class ADL:
+    """
+    Wrapper around the ADL library that binds the hot-path function
+    prototypes once and reuses the call structs across polls.
+    """
+    def __init__(self, dll):
+        self._dll = dll
+
+        # Bind prototypes once; re-assigning argtypes/restype on every call
+        # adds avoidable overhead at the tray loop's polling rate
+        self._fan_get = dll.ADL_Overdrive5_FanSpeed_Get
+        self._fan_get.argtypes = [c_int, c_int, POINTER(ADLFanSpeedValue)]
+        self._fan_get.restype = c_int
+
+        self._fan_set = dll.ADL_Overdrive5_FanSpeed_Set
+        self._fan_set.argtypes = [c_int, c_int, POINTER(ADLFanSpeedValue)]
+        self._fan_set.restype = c_int
+
+        self._temp_get = dll.ADL_Overdrive5_Temperature_Get
+        self._temp_get.argtypes = [c_int, c_int, POINTER(ADLTemperature)]
+        self._temp_get.restype = c_int
+
+        self._default_set = dll.ADL_Overdrive5_FanSpeedToDefault_Set
+        self._default_set.argtypes = [c_int, c_int]
+        self._default_set.restype = c_int
+
+        # Pre-allocate the call structs with Size set once. The write
+        # path gets its own struct: writes run on the background writer
+        # thread while reads run on the Tk thread, and sharing one
+        # buffer would let a concurrent get clobber a pending target.
+        self._fan_struct = ADLFanSpeedValue()
+        self._fan_struct.Size = sizeof(self._fan_struct)
+        self._fan_struct.SpeedType = 1  # Percentage
+
+        self._fan_write_struct = ADLFanSpeedValue()
+        self._fan_write_struct.Size = sizeof(self._fan_write_struct)
+        self._fan_write_struct.SpeedType = 1  # Percentage
+
+        self._temp_struct = ADLTemperature()
+        self._temp_struct.Size = sizeof(self._temp_struct)
+
+        # byref() builds a fresh argument wrapper per call; the structs
+        # never move, so build each wrapper once too
+        self._fan_ref = byref(self._fan_struct)
+        self._fan_write_ref = byref(self._fan_write_struct)
+        self._temp_ref = byref(self._temp_struct)
+
+    def __getattr__(self, name):
+        # Anything not wrapped here falls through to the raw DLL
+        return getattr(self._dll, name)
+
+    def get_fan_speed(self, adapter_index=0):
+        """Get the current fan speed of the GPU."""
+        result = self._fan_get(adapter_index, 0, self._fan_ref)
+        if result != 0:
+            log.debug("Failed to get fan speed. Error code: %s", result)
+            return None
+
+        return self._fan_struct.FanSpeed
+
+    def set_fan_speed(self, speed_percent, adapter_index=0):
+        """Set the GPU fan speed to a percentage (0-100)."""
+        # Bound the speed to 0-100%
+        speed_percent = max(0, min(100, speed_percent))
+
+        self._fan_write_struct.FanSpeed = speed_percent
+        self._fan_write_struct.Flags = 0
+
+        result = self._fan_set(adapter_index, 0, self._fan_write_ref)
+        if result != 0:
+            log.debug("Failed to set fan speed. Error code: %s", result)
+            return False
+
+        return True
+
+    def get_temperature(self, adapter_index=0):
+        """Get the current GPU temperature."""
+        result = self._temp_get(adapter_index, 0, self._temp_ref)
+        if result != 0:
+            log.debug("Failed to get temperature. Error code: %s", result)
+            return None
+
+        # Temperature is reported in millidegrees Celsius
+        return self._temp_struct.Temperature / 1000.0
+
+    def read_sensors(self, adapter_index=0):
+        """Read temperature and fan speed in one call, reusing both structs."""
+        temp = None
+        fan = None
+        if self._temp_get(adapter_index, 0, self._temp_ref) == 0:
+            temp = self._temp_struct.Temperature / 1000.0
+        if self._fan_get(adapter_index, 0, self._fan_ref) == 0:
+            fan = self._fan_struct.FanSpeed
+        return temp, fan
+
 def init_adl():
     """Initialize the ADL library."""
     adl = get_adl_dll()
     if not adl:
         return None
-        
+
     # Define function prototypes
     ADL_MAIN_CONTROL_CREATE = adl.ADL_Main_Control_Create
     ADL_MAIN_CONTROL_CREATE.argtypes = [c_int]
     ADL_MAIN_CONTROL_CREATE.restype = c_int
-    
+
     # Initialize ADL
     ADL_MAIN_CONTROL_CREATE(1)
-    
-    return adl
-
-def get_fan_speed(adl, adapter_index=0):
-    """Get the current fan speed of the GPU."""
-    if not adl:
-        return None
-        
-    # Define function prototype
-    ADL_OVERDRIVE5_FANSPEED_GET = adl.ADL_Overdrive5_FanSpeed_Get
-    ADL_OVERDRIVE5_FANSPEED_GET.argtypes = [c_int, c_int, POINTER(ADLFanSpeedValue)]
-    ADL_OVERDRIVE5_FANSPEED_GET.restype = c_int
-    
-    # Create fan speed struct
-    fan_speed = ADLFanSpeedValue()
-    fan_speed.Size = sizeof(fan_speed)
-    fan_speed.SpeedType = 1  # Percentage
-    
-    # Get fan speed
-    result = ADL_OVERDRIVE5_FANSPEED_GET(adapter_index, 0, byref(fan_speed))
-    if result != 0:
-        print(f"Failed to get fan speed. Error code: {result}")
-        return None
-        
-    return fan_speed.FanSpeed
-
-def set_fan_speed(adl, speed_percent, adapter_index=0):
-    """Set the GPU fan speed to a percentage (0-100)."""
-    if not adl:
-        return False
-        
-    # Bound the speed to 0-100%
-    speed_percent = max(0, min(100, speed_percent))
-    
-    # Define function prototype
-    ADL_OVERDRIVE5_FANSPEED_SET = adl.ADL_Overdrive5_FanSpeed_Set
-    ADL_OVERDRIVE5_FANSPEED_SET.argtypes = [c_int, c_int, POINTER(ADLFanSpeedValue)]
-    ADL_OVERDRIVE5_FANSPEED_SET.restype = c_int
-    
-    # Create fan speed struct
-    fan_speed = ADLFanSpeedValue()
-    fan_speed.Size = sizeof(fan_speed)
-    fan_speed.SpeedType = 1  # Percentage
-    fan_speed.FanSpeed = speed_percent
-    fan_speed.Flags = 0
-    
-    # Set fan speed
-    result = ADL_OVERDRIVE5_FANSPEED_SET(adapter_index, 0, byref(fan_speed))
-    if result != 0:
-        print(f"Failed to set fan speed. Error code: {result}")
-        return False
-        
-    return True
 
-def get_temperature(adl, adapter_index=0):
-    """Get the current GPU temperature."""
-    if not adl:
-        return None
-        
-    # Define function prototype
-    ADL_OVERDRIVE5_TEMPERATURE_GET = adl.ADL_Overdrive5_Temperature_Get
-    ADL_OVERDRIVE5_TEMPERATURE_GET.argtypes = [c_int, c_int, POINTER(ADLTemperature)]
-    ADL_OVERDRIVE5_TEMPERATURE_GET.restype = c_int
-    
-    # Create temperature struct
-    temperature = ADLTemperature()
-    temperature.Size = sizeof(temperature)
-    
-    # Get temperature
-    result = ADL_OVERDRIVE5_TEMPERATURE_GET(adapter_index, 0, byref(temperature))
-    if result != 0:
-        print(f"Failed to get temperature. Error code: {result}")
-        return None
-        
-    # Temperature is reported in millidegrees Celsius
-    return temperature.Temperature / 1000.0
+    return ADL(adl)
 
 def disable_fan_control(adl, adapter_index=0):
     """Disable manual fan control and return to automatic fan management."""
     if not adl:
         return False
-        
-    # Define function prototype
-    ADL_OVERDRIVE5_FANSPEEDTODEFAULT_SET = adl.ADL_Overdrive5_FanSpeedToDefault_Set
-    ADL_OVERDRIVE5_FANSPEEDTODEFAULT_SET.argtypes = [c_int, c_int]
-    ADL_OVERDRIVE5_FANSPEEDTODEFAULT_SET.restype = c_int
-    
-    # Reset fan control to default/automatic
-    result = ADL_OVERDRIVE5_FANSPEEDTODEFAULT_SET(adapter_index, 0)
+
+    # Reset fan control to default/automatic (prototype bound in ADL.__init__)
+    result = adl._default_set(adapter_index, 0)
     if result != 0:
         print(f"Failed to reset fan control to automatic mode. Error code: {result}")
         return False
-        
+
+    # The driver now owns the fan; the last manual write is meaningless
+    # and must not suppress the next explicit command
+    _reset_write_state()
     return True
 
 class FanCurve:
@@ -161,61 +195,231 @@ class FanCurve:
     def __init__(self, name="Default", points=None):
         self.name = name
         self.points = points or [(30, 30), (50, 40), (70, 60), (80, 80), (90, 100)]
+        # Normalize once at construction: integer temperatures, fan speeds
+        # clamped to 0-100. Interpolating between in-range endpoints stays
+        # in range, so no lookup ever needs a per-call clamp.
+        self.points = [(int(t), max(0, min(100, int(f)))) for t, f in self.points]
         # Ensure points are sorted by temperature
         self.points.sort(key=lambda p: p[0])
-        
+        self._rebuild()
+
+    def _rebuild(self):
+        """Precompute segment slopes so lookups need no per-call division"""
+        # Structure-of-arrays in typed arrays: contiguous C doubles
+        # instead of a list of (t, f) tuple objects. self.points stays the
+        # canonical form for JSON serialization and the curve dialog.
+        # Doubles, not floats: single precision turns 50.0 into
+        # 49.999998..., which int() at the call sites truncates to 49.
+        self._temps = array.array('d', (p[0] for p in self.points))
+        self._fans = array.array('d', (p[1] for p in self.points))
+        self._slopes = array.array('d')
+        for i in range(len(self.points) - 1):
+            t1, f1 = self.points[i]
+            t2, f2 = self.points[i + 1]
+            self._slopes.append((f2 - f1) / (t2 - t1) if t2 != t1 else 0.0)
+
+        # SoA copies for vectorized batch evaluation when numpy is present
+        if np is not None:
+            self._xs = np.asarray(self._temps, dtype=np.float64)
+            self._ys = np.asarray(self._fans, dtype=np.float64)
+
+        # Single-entry lookup cache in 0.5-degree buckets; at idle the
+        # reported temperature barely moves, so most lookups repeat
+        self._last_temp_key = None
+        self._last_fan = None
+
     def get_fan_speed(self, temperature):
         """Get the appropriate fan speed for the given temperature based on the curve"""
         if temperature is None:
             return None
-            
+
+        # Same 0.5-degree bucket as last time: reuse the cached result
+        key = int(temperature * 2)
+        if key == self._last_temp_key:
+            return self._last_fan
+        self._last_temp_key = key
+
         # If temperature is below the first point
-        if temperature <= self.points[0][0]:
-            return self.points[0][1]
-            
+        if temperature <= self._temps[0]:
+            fan = self._fans[0]
         # If temperature is above the last point
-        if temperature >= self.points[-1][0]:
-            return self.points[-1][1]
-            
-        # Find the two points to interpolate between
-        for i in range(len(self.points) - 1):
-            t1, f1 = self.points[i]
-            t2, f2 = self.points[i + 1]
-            
-            if t1 <= temperature <= t2:
-                # Linear interpolation between the two points
-                ratio = (temperature - t1) / (t2 - t1)
-                return f1 + ratio * (f2 - f1)
-                
-        # Fallback (should never reach here)
-        return 50
+        elif temperature >= self._temps[-1]:
+            fan = self._fans[-1]
+        else:
+            # Binary search for the segment, then apply its precomputed slope
+            i = bisect.bisect_right(self._temps, temperature) - 1
+            fan = self._fans[i] + (temperature - self._temps[i]) * self._slopes[i]
+
+        self._last_fan = fan
+        return fan
+
+    def get_fan_speed_batch(self, temps):
+        """Evaluate the curve over a window of temperature samples at once"""
+        if np is not None:
+            return np.interp(temps, self._xs, self._ys)
+        return [self.get_fan_speed(t) for t in temps]
+
+# Resolved once: both persistence helpers otherwise redo the
+# abspath/dirname chain (and a makedirs) per call
+_CONFIG_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "config")
+
+# Parsed curves keyed on (filename, mtime) so repeated load_curve() calls
+# during startup and the settings dialogs skip re-reading and re-parsing
+# an unchanged file
+_curve_cache = {}
 
 def save_curve(curve, filename="fan_curve.json"):
     """Save a fan curve to a JSON file"""
-    config_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "config")
-    os.makedirs(config_dir, exist_ok=True)
-    file_path = os.path.join(config_dir, filename)
+    os.makedirs(_CONFIG_DIR, exist_ok=True)
+    file_path = os.path.join(_CONFIG_DIR, filename)
     
-    with open(file_path, 'w') as f:
-        json.dump({"name": curve.name, "points": curve.points}, f)
+    payload = {"name": curve.name, "points": curve.points}
+    with open(file_path, 'wb') as f:
+        if orjson is not None:
+            f.write(orjson.dumps(payload))
+        else:
+            f.write(json.dumps(payload).encode('utf-8'))
     
+    _curve_cache[(filename, os.path.getmtime(file_path))] = curve
     return file_path
 
 def load_curve(filename="fan_curve.json"):
     """Load a fan curve from a JSON file"""
-    config_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "config")
-    file_path = os.path.join(config_dir, filename)
+    file_path = os.path.join(_CONFIG_DIR, filename)
     
     if not os.path.exists(file_path):
         return None
     
     try:
-        with open(file_path, 'r') as f:
-            data = json.load(f)
-            return FanCurve(data.get("name", "Loaded"), data.get("points", []))
-    except (json.JSONDecodeError, IOError):
+        cache_key = (filename, os.path.getmtime(file_path))
+        cached = _curve_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        # Binary sidecar: a pickled FanCurve skips JSON parsing and the
+        # table rebuild on the next CLI invocation. Only trusted if at
+        # least as new as the JSON, which stays the source of truth.
+        pkl_path = file_path + ".pkl"
+        try:
+            if os.path.getmtime(pkl_path) >= cache_key[1]:
+                with open(pkl_path, 'rb') as f:
+                    name, points = pickle.load(f)
+                # Reconstruct rather than unpickling a FanCurve instance:
+                # the derived tables depend on the environment (numpy
+                # present or not) and on the current class layout
+                curve = FanCurve(name, points)
+                _curve_cache[cache_key] = curve
+                return curve
+        except Exception:
+            # Best-effort cache: missing, stale, truncated (EOFError) or
+            # otherwise unreadable sidecars all fall through to the parser
+            pass
+
+        with open(file_path, 'rb') as f:
+            raw = f.read()
+        data = orjson.loads(raw) if orjson is not None else json.loads(raw)
+        curve = FanCurve(data.get("name", "Loaded"), data.get("points", []))
+        try:
+            # Write-then-rename so a crash mid-dump can't leave a
+            # truncated sidecar behind
+            tmp_path = pkl_path + ".tmp"
+            with open(tmp_path, 'wb') as f:
+                pickle.dump((curve.name, curve.points), f)
+            os.replace(tmp_path, pkl_path)
+        except OSError:
+            pass  # The sidecar is best-effort
+        _curve_cache[cache_key] = curve
+        return curve
+    except (ValueError, IOError, OSError):
         return None
 
+# Hysteresis state for coalesced fan writes
+_last_written_fan = None
+_last_increase_temp = None
+
+# Single-slot queue drained by a background writer thread. ADL writes can
+# stall for hundreds of milliseconds inside the driver; queueing them keeps
+# the polling/temperature path from blocking, and replacing any still-queued
+# value coalesces rapid sequential writes down to the newest one.
+_fan_write_q = None
+
+def _queue_fan_write(adl, speed):
+    """Hand a fan-speed write to the background writer thread."""
+    global _fan_write_q
+    if _fan_write_q is None:
+        _fan_write_q = queue.Queue(maxsize=1)
+
+        def writer():
+            while True:
+                adl.set_fan_speed(_fan_write_q.get())
+
+        threading.Thread(target=writer, daemon=True).start()
+
+    # Drop any write that hasn't been picked up yet - only the latest
+    # target matters
+    try:
+        _fan_write_q.get_nowait()
+    except queue.Empty:
+        pass
+    _fan_write_q.put(speed)
+
+def _reset_write_state():
+    """Forget the coalescing state after control returns to automatic."""
+    global _last_written_fan, _last_increase_temp
+    _last_written_fan = None
+    _last_increase_temp = None
+    # Also discard any queued-but-unwritten target: if the writer is
+    # stuck in a stalled driver call when control returns to automatic,
+    # it must not pop a stale manual speed and re-engage manual mode
+    # right after the reset
+    if _fan_write_q is not None:
+        try:
+            _fan_write_q.get_nowait()
+        except queue.Empty:
+            pass
+
+def maybe_set_fan_speed(adl, target, temp=None, threshold=3, hysteresis_delta=5,
+                        force=False):
+    """
+    Write the fan speed only when it actually needs to change.
+
+    Interpolated curve outputs jitter by a percent or two every tick, and
+    each write is a cross-DLL call into the driver. Writes are skipped when
+    the target is within `threshold` percent of the last written value, and
+    decreases are additionally held until the temperature has dropped
+    `hysteresis_delta` degrees below the point where the fan was last
+    raised. Above 85 degrees every change goes straight through, and
+    `force` bypasses both filters for explicit user commands.
+    """
+    global _last_written_fan, _last_increase_temp
+
+    if target is None:
+        return False
+
+    target = int(target)
+    hot_override = temp is not None and temp > 85
+
+    if _last_written_fan is not None and not hot_override and not force:
+        # Ignore jitter-sized changes
+        if abs(target - _last_written_fan) < threshold:
+            return False
+
+        # Only back off once we're clearly below the temp that drove the
+        # last increase - prevents speed-up/slow-down oscillation
+        if target < _last_written_fan and temp is not None \
+                and _last_increase_temp is not None \
+                and temp > _last_increase_temp - hysteresis_delta:
+            return False
+
+    # Asynchronous: the writer thread performs the driver call, so a stalled
+    # ADL write can no longer hold up the temperature sampling loop
+    _queue_fan_write(adl, target)
+
+    if _last_written_fan is None or target > _last_written_fan:
+        _last_increase_temp = temp
+    _last_written_fan = target
+    return True
+
 def temperature_control(adl, target_temp, min_fan=30, max_fan=100):
     """
     Control fan speed to maintain a target temperature.
@@ -224,8 +428,10 @@ def temperature_control(adl, target_temp, min_fan=30, max_fan=100):
     when the temperature is stable.
     """
     last_fan_speed = min_fan
-    temp_history = []
+    t_ema = None  # Exponential moving average of the temperature
     history_max_size = 10  # Store last 10 temperature readings
+    # maxlen makes eviction O(1); a plain list pays an O(N) shift per pop(0)
+    temp_history = collections.deque(maxlen=history_max_size)
     
     # Settings for adaptation
     aggressive_mode = True  # Start in aggressive mode
@@ -234,15 +440,19 @@ def temperature_control(adl, target_temp, min_fan=30, max_fan=100):
     stable_required = 6     # Readings required to consider temp stable
     
     def get_fan_speed_for_temp(current_temp):
-        nonlocal last_fan_speed, aggressive_mode, stable_counter, temp_history
+        nonlocal last_fan_speed, aggressive_mode, stable_counter, temp_history, t_ema
         
         if current_temp is None:
             return last_fan_speed
         
-        # Update temperature history
+        # Smooth the raw sample so a one-second spike doesn't jerk the fan.
+        # Aggressive mode tracks faster; gentle mode filters harder.
+        alpha = 0.5 if aggressive_mode else 0.2
+        t_ema = current_temp if t_ema is None else alpha * current_temp + (1 - alpha) * t_ema
+        
+        # Update temperature history (raw samples, so the stability check
+        # still sees the real variation rather than the filtered series)
         temp_history.append(current_temp)
-        if len(temp_history) > history_max_size:
-            temp_history.pop(0)
         
         # Check if temperature is stable
         if len(temp_history) >= 4:  # Need at least 4 readings
@@ -253,15 +463,21 @@ def temperature_control(adl, target_temp, min_fan=30, max_fan=100):
                 stable_counter += 1
                 if stable_counter >= stable_required and aggressive_mode:
                     aggressive_mode = False
-                    print("Temperature stable. Switching to gentle control mode.")
+                    log.info("Temperature stable. Switching to gentle control mode.")
             else:
                 stable_counter = 0
                 if not aggressive_mode and (abs(current_temp - target_temp) > 5.0 or temp_variation > 4.0):
                     aggressive_mode = True
-                    print("Temperature unstable. Switching to aggressive control mode.")
+                    log.info("Temperature unstable. Switching to aggressive control mode.")
+        
+        # Calculate temperature difference from target, driven by the
+        # smoothed reading
+        temp_diff = t_ema - target_temp
         
-        # Calculate temperature difference from target
-        temp_diff = current_temp - target_temp
+        # Deadband: within a degree of target the controller holds the
+        # current speed instead of nudging the PWM back and forth
+        if abs(temp_diff) < 1.0:
+            return last_fan_speed
         
         # Set control parameters based on mode
         if aggressive_mode:
@@ -305,39 +521,120 @@ def temperature_control(adl, target_temp, min_fan=30, max_fan=100):
     
     return get_fan_speed_for_temp
 
-def create_icon_image(temp, fan_speed):
-    """Create an image for the system tray icon with temperature and fan speed."""
-    # Create a blank image with white background
-    width = 64
-    height = 64
-    image = Image.new('RGB', (width, height), color=(0, 0, 0))
-    draw = ImageDraw.Draw(image)
-    
-    # Try to use a system font
+# The icon only ever uses six colors, so a palette image (1 byte/pixel
+# instead of 3) is enough; pystray converts palette bitmaps natively
+_PAL_BLACK, _PAL_RED, _PAL_ORANGE, _PAL_GREEN, _PAL_GRAY, _PAL_WHITE = range(6)
+_ICON_PALETTE = [0, 0, 0,
+                 255, 0, 0,
+                 255, 165, 0,
+                 0, 255, 0,
+                 128, 128, 128,
+                 255, 255, 255] + [0] * (256 * 3 - 18)
+
+# Icon rendering assets, built once by _load_gui(): the font (a disk
+# read plus TTF parse) and the shared 64x64 canvas
+_ICON_FONT = None
+_ICON_IMG = None
+_ICON_DRAW = None
+
+def _load_gui():
+    """Import the tray stack and build the icon assets on first use."""
+    global pystray, Image, ImageDraw, ImageFont
+    global _ICON_FONT, _ICON_IMG, _ICON_DRAW
+    if pystray is not None:
+        return
+
     try:
-        font = ImageFont.truetype("Arial", 12)
+        import pystray as pystray_mod
+        from PIL import Image as image_mod, ImageDraw as draw_mod, ImageFont as font_mod
+    except ImportError:
+        print("Required packages not found. Installing pystray and pillow...")
+        import subprocess
+        subprocess.check_call([sys.executable, "-m", "pip", "install", "pystray", "pillow"])
+        import pystray as pystray_mod
+        from PIL import Image as image_mod, ImageDraw as draw_mod, ImageFont as font_mod
+    pystray, Image, ImageDraw, ImageFont = pystray_mod, image_mod, draw_mod, font_mod
+
+    try:
+        _ICON_FONT = ImageFont.truetype("Arial", 12)
     except IOError:
         # Fall back to default
-        font = ImageFont.load_default()
-    
-    # Choose color based on temperature
+        _ICON_FONT = ImageFont.load_default()
+
+    _ICON_IMG = Image.new('P', (64, 64), _PAL_BLACK)
+    _ICON_IMG.putpalette(_ICON_PALETTE)
+    _ICON_DRAW = ImageDraw.Draw(_ICON_IMG)
+
+# Per-character 1-bit masks rendered once. Pasting a mask onto the
+# palette canvas replaces the TrueType shaping/raster path with fixed
+# blits; the icon's whole alphabet is digits plus a few symbols.
+_glyph_masks = {}
+
+def _glyph(ch):
+    cached = _glyph_masks.get(ch)
+    if cached is None:
+        advance = max(1, int(_ICON_FONT.getlength(ch)))
+        mask = Image.new('1', (advance + 2, 16), 0)
+        ImageDraw.Draw(mask).text((0, 0), ch, font=_ICON_FONT, fill=1)
+        cached = (mask, advance)
+        _glyph_masks[ch] = cached
+    return cached
+
+def _blit_text(x, y, text, color):
+    """Paste prerendered glyph masks onto the shared canvas."""
+    for ch in text:
+        mask, advance = _glyph(ch)
+        _ICON_IMG.paste(color, (x, y), mask)
+        x += advance
+
+def _icon_color(temp):
+    """Choose the temperature readout color bucket (palette index)"""
     if temp is None:
-        color = (128, 128, 128)  # Gray if unknown
+        return _PAL_GRAY    # Gray if unknown
     elif temp > 80:
-        color = (255, 0, 0)      # Red if hot
+        return _PAL_RED     # Red if hot
     elif temp > 70:
-        color = (255, 165, 0)    # Orange if warm
+        return _PAL_ORANGE  # Orange if warm
     else:
-        color = (0, 255, 0)      # Green if cool
-    
+        return _PAL_GREEN   # Green if cool
+
+# Rendered frames keyed on the values actually drawn. A temperature
+# hovering across a degree boundary otherwise re-rasterizes the same
+# two frames forever; the handful of live buckets all fit comfortably.
+_icon_cache = {}
+
+def create_icon_image(temp, fan_speed):
+    """Create an image for the system tray icon with temperature and fan speed."""
+    # round() to match the f"{temp:.0f}" used for the drawn text; a
+    # truncating key would file 69.6's "70" frame under 69
+    key = (round(temp) if temp is not None else None,
+           int(fan_speed) if fan_speed is not None else None)
+    cached = _icon_cache.get(key)
+    if cached is not None:
+        return cached
+
+    # Clear the shared canvas rather than allocating a new image
+    _ICON_DRAW.rectangle((0, 0, 64, 64), fill=_PAL_BLACK)
+
     # Draw temperature and fan speed
     temp_str = f"{temp:.0f}°C" if temp is not None else "??°C"
     fan_str = f"{fan_speed}%" if fan_speed is not None else "??%"
-    
-    draw.text((5, 10), temp_str, font=font, fill=color)
-    draw.text((5, 35), fan_str, font=font, fill=(255, 255, 255))
-    
-    return image
+
+    _blit_text(5, 10, temp_str, _icon_color(temp))
+    _blit_text(5, 35, fan_str, _PAL_WHITE)
+
+    # pystray needs its own image reference, so hand back a copy
+    if len(_icon_cache) >= 256:
+        _icon_cache.clear()  # Bound the cache; a full wipe is fine at this size
+    frame = _ICON_IMG.copy()
+    _icon_cache[key] = frame
+    return frame
+
+# Tooltip templates built once; appending f-strings rebuilt the whole
+# status line from pieces on every refresh
+_FMT_BASIC = "GPU: {:.1f}°C | Fan: {}%"
+_FMT_CURVE = _FMT_BASIC + " | Curve: {}"
+_FMT_LIMIT = _FMT_BASIC + " | Target: {}°C"
 
 def apply_fan_curve(adl, curve, interval=2):
     """Apply a fan curve continuously until interrupted"""
@@ -350,13 +647,21 @@ def apply_fan_curve(adl, curve, interval=2):
         print("\nMonitoring temperature and adjusting fan speed...")
         print("Press Ctrl+C to stop")
         
+        # Deadline-based schedule: sleeping a fixed interval after the
+        # work lets wall-clock drift accumulate and wakes the loop more
+        # often than the nominal rate under load
+        next_t = time.monotonic()
         while True:
-            temp = get_temperature(adl)
+            temp = adl.get_temperature()
             if temp is not None:
                 fan_speed = int(curve.get_fan_speed(temp))
-                set_fan_speed(adl, fan_speed)
+                maybe_set_fan_speed(adl, fan_speed, temp)
                 print(f"\rTemp: {temp:.1f}°C | Fan: {fan_speed}%", end="")
-            time.sleep(interval)
+            next_t += interval
+            now = time.monotonic()
+            if next_t <= now:
+                next_t = now + interval  # Re-anchor after a stall instead of sprinting
+            time.sleep(next_t - now)
     except KeyboardInterrupt:
         print("\nStopping fan curve application")
 
@@ -371,13 +676,18 @@ def apply_temp_limit(adl, target_temp, min_fan=30, max_fan=100, interval=2):
         print("\nMonitoring temperature and adjusting fan speed...")
         print("Press Ctrl+C to stop")
         
+        next_t = time.monotonic()
         while True:
-            temp = get_temperature(adl)
+            temp = adl.get_temperature()
             if temp is not None:
                 fan_speed = temp_controller(temp)
-                set_fan_speed(adl, fan_speed)
+                maybe_set_fan_speed(adl, fan_speed, temp)
                 print(f"\rTemp: {temp:.1f}°C | Fan: {fan_speed}%", end="")
-            time.sleep(interval)
+            next_t += interval
+            now = time.monotonic()
+            if next_t <= now:
+                next_t = now + interval  # Re-anchor after a stall
+            time.sleep(next_t - now)
     except KeyboardInterrupt:
         print("\nStopping temperature control")
 
@@ -536,11 +846,12 @@ class TempControlDialog(tk.Toplevel):
         # Target temperature
         ttk.Label(main_frame, text="Target Temperature (°C):").grid(row=0, column=0, sticky=tk.W, pady=5)
         self.target_var = tk.IntVar(value=self.current_target)
+        # command= fires only when the value changes; the old <Motion>
+        # binding ran the callback for every mouse pixel over the widget
         temp_scale = ttk.Scale(main_frame, from_=40, to=90, variable=self.target_var, 
-                              orient=tk.HORIZONTAL, length=200)
+                              orient=tk.HORIZONTAL, length=200,
+                              command=lambda v: self.update_target_label())
         temp_scale.grid(row=0, column=1, sticky=tk.W+tk.E, pady=5)
-        temp_scale.bind("<Motion>", self.update_target_label)
-        temp_scale.bind("<ButtonRelease-1>", self.update_target_label)
         self.target_label = ttk.Label(main_frame, text=str(self.current_target))
         self.target_label.grid(row=0, column=2, padx=5)
         
@@ -550,8 +861,6 @@ class TempControlDialog(tk.Toplevel):
         min_scale = ttk.Scale(main_frame, from_=0, to=100, variable=self.min_var,
                              orient=tk.HORIZONTAL, length=200)
         min_scale.grid(row=1, column=1, sticky=tk.W+tk.E, pady=5)
-        min_scale.bind("<Motion>", self.update_min_label)
-        min_scale.bind("<ButtonRelease-1>", self.update_min_label)
         self.min_label = ttk.Label(main_frame, text=str(self.current_min))
         self.min_label.grid(row=1, column=2, padx=5)
         
@@ -561,11 +870,16 @@ class TempControlDialog(tk.Toplevel):
         max_scale = ttk.Scale(main_frame, from_=0, to=100, variable=self.max_var,
                              orient=tk.HORIZONTAL, length=200)
         max_scale.grid(row=2, column=1, sticky=tk.W+tk.E, pady=5)
-        max_scale.bind("<Motion>", self.update_max_label)
-        max_scale.bind("<ButtonRelease-1>", self.update_max_label)
         self.max_label = ttk.Label(main_frame, text=str(self.current_max))
         self.max_label.grid(row=2, column=2, padx=5)
         
+        # One trace on each var replaces the pair of mutually recursive
+        # label callbacks; _clamping stops the clamp's own set() from
+        # re-entering the handler
+        self._clamping = False
+        self.min_var.trace_add("write", self._on_range_changed)
+        self.max_var.trace_add("write", self._on_range_changed)
+        
         # Buttons
         button_frame = ttk.Frame(main_frame)
         button_frame.grid(row=3, column=0, columnspan=3, pady=(10, 0))
@@ -576,17 +890,26 @@ class TempControlDialog(tk.Toplevel):
     def update_target_label(self, event=None):
         self.target_label.config(text=str(self.target_var.get()))
     
-    def update_min_label(self, event=None):
-        self.min_label.config(text=str(self.min_var.get()))
-        if self.min_var.get() > self.max_var.get():
-            self.max_var.set(self.min_var.get())
-            self.update_max_label()
-    
-    def update_max_label(self, event=None):
-        self.max_label.config(text=str(self.max_var.get()))
-        if self.max_var.get() < self.min_var.get():
-            self.min_var.set(self.max_var.get())
-            self.update_min_label()
+    def _on_range_changed(self, name=None, *_):
+        if self._clamping:
+            return
+        self._clamping = True
+        try:
+            min_fan = self.min_var.get()
+            max_fan = self.max_var.get()
+            if min_fan > max_fan:
+                # Drag the other end of the range along with whichever
+                # slider moved
+                if name == str(self.min_var):
+                    self.max_var.set(min_fan)
+                    max_fan = min_fan
+                else:
+                    self.min_var.set(max_fan)
+                    min_fan = max_fan
+            self.min_label.config(text=str(min_fan))
+            self.max_label.config(text=str(max_fan))
+        finally:
+            self._clamping = False
         
     def on_ok(self):
         target = self.target_var.get()
@@ -624,9 +947,10 @@ def monitor_in_system_tray(adl):
     """Monitor GPU temperature and fan speed in the system tray."""
     global _root_window
     
+    _load_gui()
+    
     # Initial readings
-    temp = get_temperature(adl)
-    fan_speed = get_fan_speed(adl)
+    temp, fan_speed = adl.read_sensors()
     
     # Create a hidden root window for dialogs
     root = tk.Tk()
@@ -642,54 +966,83 @@ def monitor_in_system_tray(adl):
     curve_mode = False
     temp_limit_mode = False
     current_curve = saved_curve or FanCurve()
+    recent_temps = []  # Window of recent samples for smoothed curve mode
+    last_status_key = None  # Skip re-rendering the tooltip when nothing moved
+    last_icon_key = None  # Skip republishing the bitmap when it would be identical
+    prev_temp = None  # Previous sample, for the adaptive polling cadence
+    last_repaint = 0.0  # Tray repaints run on their own, slower cadence
+    stopping = threading.Event()  # Lets the schedulers stand down on exit
     target_temp = 70
     min_fan = 30
     max_fan = 100
     
-    # Function to update the icon
-    def update_icon():
-        nonlocal temp, fan_speed
-        while True:
-            temp = get_temperature(adl)
-            fan_speed = get_fan_speed(adl)
-            
-            # Apply curve if in curve mode
-            if curve_mode and temp is not None:
-                new_fan = int(current_curve.get_fan_speed(temp))
-                if new_fan != fan_speed:
-                    set_fan_speed(adl, new_fan)
-                    fan_speed = new_fan
-            
-            # Apply temp limit if in temp limit mode
-            if temp_limit_mode and temp is not None:
-                new_fan = temp_controller(temp)
-                if new_fan != fan_speed:
-                    set_fan_speed(adl, new_fan)
-                    fan_speed = new_fan
-            
-            if icon is not None and icon.visible:
-                try:
+    # One polling step, driven by Tk's after() scheduler instead of a
+    # dedicated thread. This removes the cross-thread Tk calls (a common
+    # freeze source) and lets the process actually idle between samples.
+    def tick():
+        nonlocal temp, fan_speed, last_status_key, last_icon_key, prev_temp, last_repaint
+        if stopping.is_set():
+            return  # Tearing down; don't reschedule or touch the driver
+        temp, fan_speed = adl.read_sensors()
+
+        # Apply curve if in curve mode. The curve is evaluated over a
+        # short window of recent samples so a one-second temperature
+        # spike doesn't slam the fan to a new speed.
+        if curve_mode and temp is not None:
+            recent_temps.append(temp)
+            if len(recent_temps) > 4:
+                recent_temps.pop(0)
+            speeds = current_curve.get_fan_speed_batch(recent_temps)
+            new_fan = int(sum(speeds) / len(speeds))
+            if maybe_set_fan_speed(adl, new_fan, temp):
+                fan_speed = new_fan
+
+        # Apply temp limit if in temp limit mode
+        if temp_limit_mode and temp is not None:
+            new_fan = temp_controller(temp)
+            if maybe_set_fan_speed(adl, new_fan, temp):
+                fan_speed = new_fan
+
+        # Sampling may run at up to 4 Hz while a control mode is chasing
+        # a ramp, but the tray itself never needs that: repaint at most
+        # every 2 s and let the control path keep its fast cadence
+        now = time.monotonic()
+        if icon is not None and icon.visible and now - last_repaint >= 2.0:
+            last_repaint = now
+            try:
+                # The icon shows whole degrees, so assigning icon.icon -
+                # a Shell_NotifyIcon round-trip under pystray - is skipped
+                # unless a rendered digit (or the color bucket, which
+                # moves with the degree) changed
+                icon_key = (round(temp) if temp is not None else None, fan_speed)
+                if icon_key != last_icon_key:
+                    last_icon_key = icon_key
                     icon.icon = create_icon_image(temp, fan_speed)
-                    status = "GPU: {:.1f}°C | Fan: {}%".format(temp, fan_speed)
-                    
+
+                # Re-render the tooltip only when a displayed digit can
+                # actually change
+                status_key = (int(temp * 10) if temp is not None else None,
+                              fan_speed, curve_mode, temp_limit_mode)
+                if status_key != last_status_key:
+                    last_status_key = status_key
                     if curve_mode:
-                        status += f" | Curve: {current_curve.name}"
+                        icon.title = _FMT_CURVE.format(temp, fan_speed, current_curve.name)
                     elif temp_limit_mode:
-                        status += f" | Target: {target_temp}°C"
-                        
-                    icon.title = status
-                except Exception as e:
-                    print(f"Error updating icon: {e}")
-                    
-            # Process tkinter events to prevent freezing
-            try:
-                root.update_idletasks()
-                root.update()
-            except:
-                # Tk might be closed already
-                pass
-                
-            time.sleep(0.5)  # Update more frequently to handle UI events
+                        icon.title = _FMT_LIMIT.format(temp, fan_speed, target_temp)
+                    else:
+                        icon.title = _FMT_BASIC.format(temp, fan_speed)
+            except Exception as e:
+                log.warning("Error updating icon: %s", e)
+
+        # Adaptive cadence: scale the base interval by how fast the
+        # temperature is moving. A flat reading backs off toward the
+        # idle rate; a fast ramp polls down to 250 ms so spikes are
+        # caught without paying for that rate around the clock.
+        base_s = 0.5 if (curve_mode or temp_limit_mode) else 2.0
+        dT = abs(temp - prev_temp) if temp is not None and prev_temp is not None else 0.0
+        prev_temp = temp
+        delay_s = min(3.0, max(0.25, base_s / (1.0 + 4.0 * dT)))
+        root.after(int(delay_s * 1000), tick)
     
     # Fan curve setup dialog callback
     def on_curve_dialog_complete(result):
@@ -697,9 +1050,15 @@ def monitor_in_system_tray(adl):
         curve_dialog_open = False
         
         if result:
+            label_changed = result.name != current_curve.name
             current_curve = result
             save_curve(current_curve)
             
+            # The menu label is a callable, so a rebuild is only needed
+            # when the text it would produce actually changed
+            if label_changed and icon is not None:
+                icon.update_menu()
+            
             # Ask to enable the curve (in main thread)
             def ask_enable():
                 nonlocal curve_mode, temp_limit_mode
@@ -732,9 +1091,13 @@ def monitor_in_system_tray(adl):
         temp_dialog_open = False
         
         if result:
+            label_changed = result[0] != target_temp
             target_temp, min_fan, max_fan = result
             temp_controller = temperature_control(adl, target_temp, min_fan, max_fan)
             
+            if label_changed and icon is not None:
+                icon.update_menu()
+            
             # Ask to enable temperature control (in main thread)
             def ask_enable():
                 nonlocal temp_limit_mode, curve_mode
@@ -766,22 +1129,22 @@ def monitor_in_system_tray(adl):
     def set_speed_30():
         nonlocal curve_mode, temp_limit_mode
         curve_mode = temp_limit_mode = False
-        set_fan_speed(adl, 30)
+        maybe_set_fan_speed(adl, 30, force=True)
     
     def set_speed_50():
         nonlocal curve_mode, temp_limit_mode
         curve_mode = temp_limit_mode = False
-        set_fan_speed(adl, 50)
+        maybe_set_fan_speed(adl, 50, force=True)
     
     def set_speed_70():
         nonlocal curve_mode, temp_limit_mode
         curve_mode = temp_limit_mode = False
-        set_fan_speed(adl, 70)
+        maybe_set_fan_speed(adl, 70, force=True)
     
     def set_speed_100():
         nonlocal curve_mode, temp_limit_mode
         curve_mode = temp_limit_mode = False
-        set_fan_speed(adl, 100)
+        maybe_set_fan_speed(adl, 100, force=True)
     
     def toggle_curve():
         nonlocal curve_mode, temp_limit_mode
@@ -797,40 +1160,62 @@ def monitor_in_system_tray(adl):
             if not temp_controller:
                 temp_controller = temperature_control(adl, target_temp, min_fan, max_fan)
     
-    def configure_curve():
-        root.after(0, setup_fan_curve)  # Schedule in main thread
-    
-    def configure_temp():
-        root.after(0, setup_temp_limit)  # Schedule in main thread
-    
     def reset_to_auto():
         nonlocal curve_mode, temp_limit_mode
         curve_mode = temp_limit_mode = False
         disable_fan_control(adl)
-    
+
     def exit_app():
         print("Exiting application...")
-        root.after(0, root.quit)  # Schedule quit in the main thread
+        # Flag first so tick/pump stand down on their next pass, then let
+        # Tk quit and the tray removal proceed in parallel on their own
+        # threads instead of one blocking the other
+        stopping.set()
+        root.after(0, root.quit)
         if icon and icon.visible:
             icon.stop()
+
+    # pystray invokes menu callbacks on its own thread; marshal them onto
+    # the Tk thread so mode flags and driver calls never race the tick()
+    # loop. Producers only touch the queue - one resident after() timer
+    # drains it, instead of allocating a Tk timer per menu click.
+    ui_q = queue.SimpleQueue()
+
+    def on_main(fn):
+        return lambda icon=None, item=None: ui_q.put(fn)
+
+    def pump():
+        while True:
+            try:
+                fn = ui_q.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                fn()
+            except Exception as e:
+                # A failing handler must not kill the pump, or every
+                # menu item goes dead for the rest of the session
+                log.warning("Error in tray callback: %s", e)
+        if not stopping.is_set():
+            root.after(100, pump)
     
     # Initialize temperature controller
     temp_controller = temperature_control(adl, target_temp, min_fan, max_fan)
     
     # Create and display the icon with expanded menu
     menu = (
-        pystray.MenuItem("Set Fan 30%", set_speed_30),
-        pystray.MenuItem("Set Fan 50%", set_speed_50),
-        pystray.MenuItem("Set Fan 70%", set_speed_70),
-        pystray.MenuItem("Set Fan 100%", set_speed_100),
+        pystray.MenuItem("Set Fan 30%", on_main(set_speed_30)),
+        pystray.MenuItem("Set Fan 50%", on_main(set_speed_50)),
+        pystray.MenuItem("Set Fan 70%", on_main(set_speed_70)),
+        pystray.MenuItem("Set Fan 100%", on_main(set_speed_100)),
         pystray.Menu.SEPARATOR,
-        pystray.MenuItem(f"Use Fan Curve ({current_curve.name})", toggle_curve, checked=lambda _: curve_mode),
-        pystray.MenuItem("Configure Fan Curve", configure_curve),
+        pystray.MenuItem(lambda item: f"Use Fan Curve ({current_curve.name})", on_main(toggle_curve), checked=lambda _: curve_mode),
+        pystray.MenuItem("Configure Fan Curve", on_main(setup_fan_curve)),
         pystray.Menu.SEPARATOR,
-        pystray.MenuItem(f"Maintain {target_temp}°C", toggle_temp_limit, checked=lambda _: temp_limit_mode),
-        pystray.MenuItem("Configure Temp Target", configure_temp),
+        pystray.MenuItem(lambda item: f"Maintain {target_temp}°C", on_main(toggle_temp_limit), checked=lambda _: temp_limit_mode),
+        pystray.MenuItem("Configure Temp Target", on_main(setup_temp_limit)),
         pystray.Menu.SEPARATOR,
-        pystray.MenuItem("Auto Control", reset_to_auto),
+        pystray.MenuItem("Auto Control", on_main(reset_to_auto)),
         pystray.MenuItem("Exit", exit_app)
     )
     
@@ -840,14 +1225,12 @@ def monitor_in_system_tray(adl):
                        f"GPU: {temp:.1f}°C | Fan: {fan_speed}%",
                        menu)
     
-    # Start the update thread
-    update_thread = threading.Thread(target=update_icon, daemon=True)
-    update_thread.start()
-    
-    # Run the icon in its own thread to avoid blocking the main thread
-    icon_thread = threading.Thread(target=icon.run, daemon=True)
-    icon_thread.start()
-    
+    # Run pystray detached; Tk keeps the main thread and owns the event
+    # pump, with the polling tick scheduled through after()
+    icon.run_detached()
+    root.after(100, pump)
+    root.after(500, tick)
+
     try:
         # Start the main loop - this should not block
         print("System tray icon activated. Look for the icon in your system tray.")
@@ -865,6 +1248,7 @@ def monitor_in_system_tray(adl):
                 pass
 
 def main():
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
     print("AMD Radeon 5700 Fan Controller")
     adl = init_adl()
     
@@ -874,8 +1258,7 @@ def main():
     
     try:
         # Show current stats
-        current_fan = get_fan_speed(adl)
-        current_temp = get_temperature(adl)
+        current_temp, current_fan = adl.read_sensors()
         
         print(f"Current fan speed: {current_fan}%")
         print(f"Current temperature: {current_temp:.1f}°C")
@@ -909,7 +1292,7 @@ def main():
                 speed = int(sys.argv[1])
                 if 0 <= speed <= 100:
                     print(f"Setting fan speed to {speed}%")
-                    if set_fan_speed(adl, speed):
+                    if adl.set_fan_speed(speed):
                         print(f"Fan speed successfully set to {speed}%")
                     else:
                         print("Failed to set fan speed")